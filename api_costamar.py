@@ -1,20 +1,92 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from costamar_v4_2_FINAL_VERIFICADO import buscar_vuelos
-import hashlib, time as _time
+import hashlib, math, os, threading, time as _time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
 
 _cache = {}
-CACHE_TTL = 300  # 5 minutos
+CACHE_TTL = 300  # 5 minutos (TTL inicial de cada ruta)
 
-def cache_get(key):
+# TTL adaptativo: cada (ruta, días hasta la salida) ajusta su TTL según cuánto
+# cambian realmente los resultados al refrescar
+CACHE_TTL_MIN = int(os.environ.get('CACHE_TTL_MIN', 60))     # 1 minuto
+CACHE_TTL_MAX = int(os.environ.get('CACHE_TTL_MAX', 3600))   # 1 hora
+CACHE_TTL_SUBIDA = 1.5   # refresco sin cambios → TTL más largo
+CACHE_TTL_BAJADA = 0.5   # refresco con cambios → TTL más corto
+# Solo cuenta un refresco si la entrada vencida tiene como mucho VENTANA × TTL de edad:
+# en una ruta consultada una vez al día, comparar contra datos de ayer no mide volatilidad
+CACHE_TTL_VENTANA = 2
+
+if CACHE_TTL_MIN < 1:
+    raise ValueError(f"CACHE_TTL_MIN ({CACHE_TTL_MIN}) debe ser al menos 1 segundo")
+if CACHE_TTL_MIN > CACHE_TTL_MAX:
+    raise ValueError(f"CACHE_TTL_MIN ({CACHE_TTL_MIN}) no puede ser mayor que CACHE_TTL_MAX ({CACHE_TTL_MAX})")
+CACHE_TTL_INICIAL = min(max(CACHE_TTL, CACHE_TTL_MIN), CACHE_TTL_MAX)
+
+# (días máximos, etiqueta) — lo que queda fuera va a "61+"
+RANGOS_DIAS = ((3, '0-3'), (7, '4-7'), (14, '8-14'), (30, '15-30'), (60, '31-60'))
+
+_volatilidad = {}  # (ruta, rango_dias) -> {'ttl', 'refrescos', 'cambios'}
+_volatilidad_lock = threading.Lock()
+
+def grupo_volatilidad(ruta, fecha_ida):
+    """Agrupa por ruta y días hasta la salida: ('LIM-CUZ', '8-14')"""
+    try:
+        dias = (datetime.strptime(fecha_ida, '%Y%m%d').date() - date.today()).days
+    except (TypeError, ValueError):
+        return (ruta, 'N/A')
+    for maximo, etiqueta in RANGOS_DIAS:
+        if dias <= maximo:
+            return (ruta, etiqueta)
+    return (ruta, '61+')
+
+def firma_resultado(resultado):
+    """Precio más barato + conjunto de vuelos, para saber si un refresco trajo algo nuevo"""
+    vuelos = resultado.get('vuelos', [])
+    precios = [v['precio'] for v in vuelos if v.get('precio', 0) > 0]
+    # Ida y vuelta: también cuentan los tramos de regreso, no solo el primer nivel
+    conjunto = sorted(
+        ((v.get('numero_vuelo', ''), v.get('hora_salida', '')),)
+        + tuple((t.get('numero_vuelo', ''), t.get('hora_salida', '')) for t in v.get('tramos') or ())
+        for v in vuelos
+    )
+    return (min(precios) if precios else 0.0, conjunto)
+
+def cache_ttl(grupo):
+    if grupo is None:
+        return CACHE_TTL
+    estado = _volatilidad.get(grupo)
+    return estado['ttl'] if estado else CACHE_TTL_INICIAL
+
+def registrar_refresco(grupo, anterior, nuevo):
+    """Ajusta el TTL del grupo según si el refresco cambió el resultado"""
+    cambio = firma_resultado(anterior) != firma_resultado(nuevo)
+    with _volatilidad_lock:
+        estado = _volatilidad.setdefault(grupo, {'ttl': CACHE_TTL_INICIAL, 'refrescos': 0, 'cambios': 0})
+        estado['refrescos'] += 1
+        if cambio:
+            estado['cambios'] += 1
+            estado['ttl'] = max(CACHE_TTL_MIN, int(estado['ttl'] * CACHE_TTL_BAJADA))
+        else:
+            # Siempre sube al menos 1 s: con TTL chicos int(ttl * 1.5) se quedaría igual
+            estado['ttl'] = min(CACHE_TTL_MAX, max(estado['ttl'] + 1, math.ceil(estado['ttl'] * CACHE_TTL_SUBIDA)))
+
+def cache_get(key, grupo=None):
     if key in _cache:
         data, ts = _cache[key]
-        if _time.time() - ts < CACHE_TTL:
+        if _time.time() - ts < cache_ttl(grupo):
             return data
     return None
 
-def cache_set(key, data):
-    _cache[key] = (data, _time.time())
+def cache_set(key, data, grupo=None):
+    # La entrada vencida sigue en _cache: sirve para medir si el refresco cambió algo
+    ahora = _time.time()
+    if grupo is not None and key in _cache:
+        anterior, ts = _cache[key]
+        if ahora - ts <= CACHE_TTL_VENTANA * cache_ttl(grupo):
+            registrar_refresco(grupo, anterior, data)
+    _cache[key] = (data, ahora)
 
 app = Flask(__name__)
 CORS(app)
@@ -62,14 +134,241 @@ def obtener_codigo_iata(ciudad):
     ciudad_limpia = ciudad.split(',')[0].strip().lower()
     return CIUDADES_A_IATA.get(ciudad_limpia)
 
+# Formato compacto: campos comunes a toda la búsqueda van en la cabecera,
+# el resto viaja como columnas paralelas (una posición por vuelo)
+CAMPOS_BUSQUEDA = (
+    'origen', 'origen_nombre', 'destino', 'destino_nombre',
+    'fecha_ida', 'fecha_ida_formato', 'fecha_vuelta', 'fecha_vuelta_formato',
+    'adultos', 'ninos', 'infantes', 'pasajeros_total', 'fecha',
+)
+# Strings muy repetidos: se envían una vez en un diccionario y la columna lleva índices
+CAMPOS_DICCIONARIO = ('aerolinea', 'clase', 'moneda')
+
+def leer_campos(valor):
+    """Acepta 'precio,aerolinea' o ['precio', 'aerolinea'] y devuelve una lista limpia"""
+    if not valor:
+        return None
+    if isinstance(valor, str):
+        valor = valor.split(',')
+    campos = [str(c).strip() for c in valor if str(c).strip()]
+    return campos or None
+
+def proyectar_vuelos(vuelos, campos):
+    """Deja en cada vuelo (y en cada uno de sus tramos) solo los campos pedidos (fields=)"""
+    if not campos:
+        return vuelos
+    proyectados = []
+    for v in vuelos:
+        proyectado = {c: v[c] for c in campos if c in v}
+        if 'tramos' in proyectado:
+            proyectado['tramos'] = [{c: t[c] for c in campos if c in t} for t in proyectado['tramos']]
+        proyectados.append(proyectado)
+    return proyectados
+
+def compactar_vuelos(vuelos, campos=None):
+    """Convierte la lista de vuelos a formato columnar con cabecera y diccionarios"""
+    if not vuelos:
+        return {'total': 0, 'busqueda': {}, 'diccionarios': {}, 'columnas': {}}
+    
+    # Campos de cualquier vuelo, no solo del primero (puede no tener algún campo, ej: tramos)
+    presentes = dict.fromkeys(c for v in vuelos for c in v)
+    nombres = [c for c in (campos or presentes) if c in presentes]
+    
+    busqueda = {}
+    columnas = {}
+    diccionarios = {}
+    for campo in nombres:
+        # Ida y vuelta: cada tramo se compacta igual que la lista de vuelos
+        if campo == 'tramos':
+            continue
+        valores = [v.get(campo) for v in vuelos]
+        # Solo se sube a la cabecera si realmente es igual en todos los vuelos
+        if campo in CAMPOS_BUSQUEDA and all(campo in v and v[campo] == valores[0] for v in vuelos):
+            busqueda[campo] = valores[0]
+        elif campo in CAMPOS_DICCIONARIO:
+            indices = {}
+            columnas[campo] = [indices.setdefault(x, len(indices)) for x in valores]
+            diccionarios[campo] = list(indices)
+        else:
+            columnas[campo] = valores
+    
+    compacto = {
+        'total': len(vuelos),
+        'busqueda': busqueda,
+        'diccionarios': diccionarios,
+        'columnas': columnas,
+    }
+    if 'tramos' in nombres:
+        compacto['tramos'] = compactar_tramos(vuelos, campos)
+    return compacto
+
+def compactar_tramos(vuelos, campos=None):
+    """Compacta el tramo i de todos los vuelos como una lista de vuelos más.
+    Si no todos los vuelos tienen ese tramo, 'indices' dice a qué vuelo va cada fila"""
+    tramos = [v.get('tramos') or () for v in vuelos]
+    compactos = []
+    for i in range(max(len(t) for t in tramos)):
+        indices = [j for j, t in enumerate(tramos) if i < len(t)]
+        compacto = compactar_vuelos([tramos[j][i] for j in indices], campos)
+        if len(indices) < len(vuelos):
+            compacto['indices'] = indices
+        compactos.append(compacto)
+    return compactos
+
+def formatear_vuelos(vuelos, formato, campos):
+    """Aplica fields= y format= sobre una lista de vuelos (el caché guarda siempre la completa)"""
+    if formato == 'compact':
+        fragmento = {'formato': 'compact'}
+        fragmento.update(compactar_vuelos(vuelos, campos))
+        return fragmento
+    return {'vuelos': proyectar_vuelos(vuelos, campos)}
+
+def formatear_resultado(resultado, formato, campos):
+    respuesta = {'success': True}
+    respuesta.update(formatear_vuelos(resultado['vuelos'], formato, campos))
+    return respuesta
+
+MAX_TRAMOS = 6
+MAX_BUSQUEDAS_PARALELAS = 4
+
+# Pool compartido entre pedidos: sus hilos (y la sesión HTTP de cada uno, ver
+# obtener_sesion) siguen vivos entre un multidestino y el siguiente
+_pool_tramos = ThreadPoolExecutor(max_workers=MAX_BUSQUEDAS_PARALELAS, thread_name_prefix='tramo')
+
+def error_pedido(data):
+    """Valida los tipos del JSON de /api/cotizar. Retorna el mensaje de error o None"""
+    if not isinstance(data, dict):
+        return 'Se esperaba un objeto JSON'
+    for campo in ('origen', 'destino', 'fechaIda', 'format'):
+        if not isinstance(data.get(campo, ''), str):
+            return f"'{campo}' debe ser texto"
+    if data.get('fechaVuelta') is not None and not isinstance(data['fechaVuelta'], str):
+        return "'fechaVuelta' debe ser texto"
+    try:
+        if int(data.get('adultos', 1)) < 1:
+            return "'adultos' debe ser al menos 1"
+    except (TypeError, ValueError):
+        return "'adultos' debe ser un número"
+    campos = data.get('fields')
+    if campos is not None and not isinstance(campos, str) and not (
+            isinstance(campos, list) and all(isinstance(c, str) for c in campos)):
+        return "'fields' debe ser texto o lista de textos"
+    tramos = data.get('tramos')
+    if tramos is not None:
+        if not isinstance(tramos, list):
+            return "'tramos' debe ser una lista"
+        for tramo in tramos:
+            if not isinstance(tramo, dict) or not all(
+                    isinstance(tramo.get(c, ''), str) for c in ('origen', 'destino', 'fechaIda')):
+                return "Cada tramo debe ser un objeto con 'origen', 'destino' y 'fechaIda' de texto"
+    return None
+
+def cotizar_tramo(codigo_origen, codigo_destino, fecha_ida, fecha_vuelta, adultos):
+    """Busca un tramo (o ida y vuelta) pasando por el caché. Retorna None si no hay vuelos"""
+    
+    # Sin fecha de vuelta la clave es la misma de siempre: un tramo de multidestino
+    # reutiliza la caché de una búsqueda solo ida equivalente y viceversa
+    cache_key = hashlib.md5(f"{codigo_origen}{codigo_destino}{fecha_ida}{fecha_vuelta or ''}{adultos}".encode()).hexdigest()
+    grupo = grupo_volatilidad(f"{codigo_origen}-{codigo_destino}" + ("-RT" if fecha_vuelta else ""), fecha_ida)
+    cached = cache_get(cache_key, grupo)
+    if cached:
+        print(f"⚡ Respuesta desde caché ({codigo_origen} → {codigo_destino})")
+        return cached
+    
+    print(f"\n🔍 Buscando: {codigo_origen} → {codigo_destino} ({adultos} pasajeros)")
+    
+    vuelos = buscar_vuelos(
+        origen=codigo_origen,
+        destino=codigo_destino,
+        fecha_ida=fecha_ida,
+        fecha_vuelta=fecha_vuelta,
+        adultos=adultos,
+        ninos=0,
+        infantes=0,
+        top=None,
+        mostrar=False
+    )
+    
+    if not vuelos:
+        return None
+    
+    print(f"✅ {len(vuelos)} vuelos encontrados")
+    
+    resultado = {'success': True, 'vuelos': vuelos}
+    cache_set(cache_key, resultado, grupo)
+    return resultado
+
+def cotizar_multidestino(tramos, adultos, formato, campos):
+    """Cotiza cada tramo por separado y en paralelo (multidestino / open-jaw)"""
+    
+    if len(tramos) > MAX_TRAMOS:
+        return {'success': False, 'error': f'Máximo {MAX_TRAMOS} tramos'}, 400
+    
+    rutas = []
+    for tramo in tramos:
+        codigo_origen = obtener_codigo_iata(tramo.get('origen', ''))
+        codigo_destino = obtener_codigo_iata(tramo.get('destino', ''))
+        if not codigo_origen or not codigo_destino:
+            return {'success': False, 'error': 'Ciudad no encontrada'}, 400
+        rutas.append((codigo_origen, codigo_destino, tramo.get('fechaIda', '')))
+    
+    # Tramos repetidos dentro del mismo itinerario se buscan una sola vez.
+    # Las tablas no se imprimen desde la API: solo quedan logs de una línea,
+    # que pueden intercalarse entre tramos
+    unicas = list(dict.fromkeys(rutas))
+    futuros = {ruta: _pool_tramos.submit(cotizar_tramo, ruta[0], ruta[1], ruta[2], None, adultos) for ruta in unicas}
+    resultados = {ruta: futuro.result() for ruta, futuro in futuros.items()}
+    
+    respuesta_tramos = []
+    precio_minimo_total = 0.0
+    for i, ruta in enumerate(rutas, 1):
+        resultado = resultados[ruta]
+        if not resultado:
+            return {'success': False, 'error': f'No se encontraron vuelos para el tramo {i}'}, 200
+        
+        # Sin ningún vuelo con precio el tramo queda en None y el total no se puede calcular
+        precios = [v['precio'] for v in resultado['vuelos'] if v['precio'] > 0]
+        precio_minimo = round(min(precios), 2) if precios else None
+        if precio_minimo is None or precio_minimo_total is None:
+            precio_minimo_total = None
+        else:
+            precio_minimo_total += precio_minimo
+        
+        tramo = {'origen': ruta[0], 'destino': ruta[1], 'fecha_ida': ruta[2], 'precio_minimo': precio_minimo}
+        tramo.update(formatear_vuelos(resultado['vuelos'], formato, campos))
+        respuesta_tramos.append(tramo)
+    
+    return {
+        'success': True,
+        'tipo': 'multidestino',
+        'tramos': respuesta_tramos,
+        'precio_minimo_total': round(precio_minimo_total, 2) if precio_minimo_total is not None else None,
+    }, 200
+
 @app.route('/api/cotizar', methods=['POST'])
 def cotizar_vuelo():
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True)
+        error = error_pedido(data)
+        if error:
+            return jsonify({'success': False, 'error': error}), 400
+        
         origen = data.get('origen', '')
         destino = data.get('destino', '')
         fecha_ida = data.get('fechaIda', '')
+        fecha_vuelta = data.get('fechaVuelta') or None
+        tramos = data.get('tramos') or []
         adultos = int(data.get('adultos', 1))
+        formato = data.get('format', request.args.get('format', 'full'))
+        campos = leer_campos(data.get('fields', request.args.get('fields')))
+        
+        if formato not in ('full', 'compact'):
+            return jsonify({'success': False, 'error': 'Formato no soportado'}), 400
+        
+        # Multidestino: cada tramo es una búsqueda independiente
+        if tramos:
+            respuesta, status = cotizar_multidestino(tramos, adultos, formato, campos)
+            return jsonify(respuesta), status
         
         codigo_origen = obtener_codigo_iata(origen)
         codigo_destino = obtener_codigo_iata(destino)
@@ -77,41 +376,39 @@ def cotizar_vuelo():
         if not codigo_origen or not codigo_destino:
             return jsonify({'success': False, 'error': 'Ciudad no encontrada'}), 400
         
-        # Caché — va AQUÍ, después de tener los códigos IATA
-        cache_key = hashlib.md5(f"{codigo_origen}{codigo_destino}{fecha_ida}{adultos}".encode()).hexdigest()
-        cached = cache_get(cache_key)
-        if cached:
-            print("⚡ Respuesta desde caché")
-            return jsonify(cached)
-        
-        print(f"\n🔍 Buscando: {codigo_origen} → {codigo_destino} ({adultos} pasajeros)")
+        resultado = cotizar_tramo(codigo_origen, codigo_destino, fecha_ida, fecha_vuelta, adultos)
         
-        vuelos = buscar_vuelos(
-            origen=codigo_origen,
-            destino=codigo_destino,
-            fecha_ida=fecha_ida,
-            fecha_vuelta=None,
-            adultos=adultos,
-            ninos=0,
-            infantes=0,
-            top=None
-        )
-        
-        if not vuelos:
+        if not resultado:
             return jsonify({'success': False, 'error': 'No se encontraron vuelos'})
         
-        print(f"✅ {len(vuelos)} vuelos encontrados")
-        
-        # Guardar en caché antes de retornar
-        resultado = {'success': True, 'vuelos': vuelos}
-        cache_set(cache_key, resultado)
-        
-        return jsonify(resultado)
+        return jsonify(formatear_resultado(resultado, formato, campos))
         
     except Exception as e:
         print(f"❌ Error: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/cache/ttl', methods=['GET'])
+def cache_ttl_actual():
+    """TTL vigente por ruta y días hasta la salida, con la tasa de cambio observada"""
+    with _volatilidad_lock:
+        grupos = [
+            {
+                'ruta': ruta,
+                'dias': dias,
+                'ttl': estado['ttl'],
+                'refrescos': estado['refrescos'],
+                'cambios': estado['cambios'],
+                'tasa_cambio': round(estado['cambios'] / estado['refrescos'], 3) if estado['refrescos'] else 0.0,
+            }
+            for (ruta, dias), estado in sorted(_volatilidad.items())
+        ]
+    return jsonify({
+        'ttl_inicial': CACHE_TTL_INICIAL,
+        'ttl_min': CACHE_TTL_MIN,
+        'ttl_max': CACHE_TTL_MAX,
+        'grupos': grupos,
+    })
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     return jsonify({'status': 'OK'})
@@ -123,6 +420,7 @@ if __name__ == '__main__':
     print("📡 URL: http://localhost:5000")
     print("✅ Endpoints:")
     print("   • POST /api/cotizar")
+    print("   • GET  /api/cache/ttl")
     print("   • GET  /api/health")
     print("="*60 + "\n")
 
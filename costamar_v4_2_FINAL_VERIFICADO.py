@@ -9,7 +9,9 @@ import time
 import random
 import csv
 import os
+import threading
 from datetime import datetime
+from decimal import Decimal, InvalidOperation
 
 # ==========================================
 # ⚙️ CONFIGURACIÓN
@@ -32,9 +34,18 @@ HEADERS = {
     'Referer': 'https://booking.clickandbook.com/',
 }
 
-# Sesión persistente — AQUÍ, después de HEADERS
-_session = requests.Session()
-_session.headers.update(HEADERS)
+# Sesión persistente por hilo — requests.Session no es thread-safe y la API
+# busca los tramos de un multidestino en paralelo
+_sesiones = threading.local()
+
+def obtener_sesion():
+    """Sesión HTTP del hilo actual (se crea la primera vez)"""
+    sesion = getattr(_sesiones, 'sesion', None)
+    if sesion is None:
+        sesion = _sesiones.sesion = requests.Session()
+        sesion.headers.update(HEADERS)
+    return sesion
+
 # Nombres de meses en español
 MESES = {
     '01': 'Enero', '02': 'Febrero', '03': 'Marzo', '04': 'Abril',
@@ -70,6 +81,25 @@ def nombre_aeropuerto(codigo):
     nombre = AEROPUERTOS.get(codigo, codigo)
     return f"{nombre} ({codigo})"
 
+def limpiar_numero(texto):
+    """Deja un string de precio listo para float(): '$ 1,234.50' -> '1234.50'"""
+    limpio = texto.replace('$', '').replace(' ', '').strip()
+    # Si tiene coma Y punto, la coma es separador de miles
+    if ',' in limpio and '.' in limpio:
+        limpio = limpio.replace(',', '')
+    # Si solo tiene coma, podría ser decimal (europeo) o miles
+    elif ',' in limpio:
+        # Si hay más de una coma, son separadores de miles
+        if limpio.count(',') > 1:
+            limpio = limpio.replace(',', '')
+        # Si la coma está a 3 dígitos del final, es separador de miles
+        elif len(limpio.split(',')[1]) == 3:
+            limpio = limpio.replace(',', '')
+        # Si la coma está a 2 dígitos del final, es decimal
+        else:
+            limpio = limpio.replace(',', '.')
+    return limpio
+
 def convertir_a_numero(valor):
     """Convierte cualquier valor a número float, maneja comas como separadores de miles"""
     if valor is None:
@@ -78,23 +108,7 @@ def convertir_a_numero(valor):
         return float(valor)
     if isinstance(valor, str):
         try:
-            # Limpiar el string
-            limpio = valor.replace('$', '').replace(' ', '').strip()
-            # Si tiene coma Y punto, la coma es separador de miles
-            if ',' in limpio and '.' in limpio:
-                limpio = limpio.replace(',', '')
-            # Si solo tiene coma, podría ser decimal (europeo) o miles
-            elif ',' in limpio:
-                # Si hay más de una coma, son separadores de miles
-                if limpio.count(',') > 1:
-                    limpio = limpio.replace(',', '')
-                # Si la coma está a 3 dígitos del final, es separador de miles
-                elif len(limpio.split(',')[1]) == 3:
-                    limpio = limpio.replace(',', '')
-                # Si la coma está a 2 dígitos del final, es decimal
-                else:
-                    limpio = limpio.replace(',', '.')
-            return float(limpio)
+            return float(limpiar_numero(valor))
         except:
             return 0.0
     return 0.0
@@ -132,7 +146,7 @@ def buscar_vuelos_api(origen, destino, fecha_ida, fecha_vuelta=None, adultos=1,
     }
     
     try:
-        response = _session.post(
+        response = obtener_sesion().post(
     "https://costamar.com.pe/vuelos/api/flights/search",
     json=payload,
     timeout=12
@@ -146,42 +160,189 @@ def buscar_vuelos_api(origen, destino, fecha_ida, fecha_vuelta=None, adultos=1,
         return []
 
 
-def extraer_precio(vuelo):
+# Valores por defecto de un tramo (también los del primer nivel de cada vuelo)
+_TRAMO_VACIO = {
+    'aerolinea': "N/A",
+    'numero_vuelo': "N/A",
+    'hora_salida': "N/A",
+    'hora_llegada': "N/A",
+    'duracion': "N/A",
+    'escalas': 0,
+    'escalas_texto': "Directo",
+    'equipaje_bodega': "No especificado",
+    'equipaje_mano': "No especificado",
+    'personal_item': "Incluido (bolso/mochila)",
+    'clase': "Economy",
+}
+
+# Campos de precio en orden de prioridad: totalAmount suele ser numérico, total puede ser string
+_CAMPOS_PRECIO = ('totalAmount', 'total', 'grandTotal')
+_FALTA = object()
+
+def _nuevas_caches():
+    """Cachés de una pasada de normalización: precios, equipajes y duraciones se repiten mucho"""
+    return {'precios': {}, 'bodega': {}, 'mano': {}, 'duracion': {}}
+
+def convertir_a_decimal(valor):
+    """Como convertir_a_numero, pero en Decimal (precio exacto). NaN/infinito → 0"""
+    if isinstance(valor, float):
+        valor = str(valor)
+    elif isinstance(valor, str):
+        valor = limpiar_numero(valor)
+    elif not isinstance(valor, int):
+        return Decimal(0)
+    try:
+        numero = Decimal(valor)
+    except (ValueError, InvalidOperation):
+        return Decimal(0)
+    # Decimal('NaN') no se puede comparar con > 0
+    return numero if numero.is_finite() else Decimal(0)
+
+def _a_numero(valor, exacto, precios):
+    """Convierte un precio guardando en caché los strings ya parseados"""
+    if isinstance(valor, str):
+        numero = precios.get(valor)
+        if numero is None:
+            numero = precios[valor] = convertir_a_decimal(valor) if exacto else convertir_a_numero(valor)
+        return numero
+    return convertir_a_decimal(valor) if exacto else convertir_a_numero(valor)
+
+def _texto_equipaje(equipaje, con_piezas, incluido, cache):
+    """Texto de equipaje a partir de pieces/description (con caché por combinación)"""
+    piezas = str(equipaje.get('pieces', '0'))
+    desc = equipaje.get('description', '')
+    clave = (piezas, desc)
+    texto = cache.get(clave)
+    if texto is None:
+        if piezas != '0' and piezas != '':
+            texto = con_piezas.format(piezas)
+        else:
+            desc = desc.upper()
+            texto = incluido if 'INCLUDED' in desc or 'INCLUIDO' in desc else "No incluido"
+        cache[clave] = texto
+    return texto
+
+def _texto_duracion(dur, cache):
+    """'0125' → '1h 25m'"""
+    texto = cache.get(dur)
+    if texto is None:
+        texto = "N/A"
+        if dur and len(dur) >= 4:
+            try:
+                texto = f"{int(dur[:2])}h {int(dur[2:4])}m"
+            except (ValueError, IndexError):
+                texto = "N/A"
+        cache[dur] = texto
+    return texto
+
+
+def extraer_precio(vuelo, exacto=False, caches=None):
     """Extrae precio del campo pricing con máxima precisión"""
-    precio = 0.0
+    precios = caches['precios'] if caches else {}
+    precio = Decimal(0) if exacto else 0.0
     moneda = "USD"
     
-    if 'pricing' in vuelo:
-        pricing = vuelo['pricing']
-        if isinstance(pricing, dict):
-            # Prioridad: totalAmount > total > base+taxes
-            # totalAmount suele ser numérico, total puede ser string
-            if 'totalAmount' in pricing:
-                precio = convertir_a_numero(pricing['totalAmount'])
-            elif 'total' in pricing:
-                precio = convertir_a_numero(pricing['total'])
-            elif 'grandTotal' in pricing:
-                precio = convertir_a_numero(pricing['grandTotal'])
+    pricing = vuelo.get('pricing')
+    if isinstance(pricing, dict):
+        # Prioridad: totalAmount > total > grandTotal > base+taxes
+        for campo in _CAMPOS_PRECIO:
+            valor = pricing.get(campo, _FALTA)
+            if valor is not _FALTA:
+                precio = _a_numero(valor, exacto, precios)
+                break
+        else:
             # Fallback: sumar base + taxes si existen
-            elif 'base' in pricing and 'taxes' in pricing:
-                base = convertir_a_numero(pricing['base'])
-                taxes = convertir_a_numero(pricing['taxes'])
-                precio = base + taxes
-            
-            # Extraer moneda
-            moneda = pricing.get('currency', pricing.get('currencyCode', 'USD'))
-            if not moneda or moneda == '':
-                moneda = 'USD'
+            if 'base' in pricing and 'taxes' in pricing:
+                precio = _a_numero(pricing['base'], exacto, precios) + _a_numero(pricing['taxes'], exacto, precios)
+        
+        # Extraer moneda
+        moneda = pricing.get('currency', pricing.get('currencyCode', 'USD')) or 'USD'
     
     return precio, moneda
 
 
-def extraer_info_vuelo(vuelo, origen, destino, fecha_ida, fecha_vuelta, adultos, ninos, infantes):
+def extraer_info_tramo(tramo, caches=None):
+    """Extrae la información de un tramo del itinerario (primer vuelo ofrecido)"""
+    info = dict(_TRAMO_VACIO)
+    _llenar_tramo(info, tramo, caches or _nuevas_caches())
+    return info
+
+
+def _llenar_tramo(info, tramo, caches):
+    """Escribe en info (que ya trae los valores de _TRAMO_VACIO) los datos del tramo"""
+    flights = tramo.get('flights')
+    if not flights:
+        return
+    flight = flights[0]
+    segments = flight.get('segments', _FALTA)
+    
+    # Aerolínea
+    aerolinea = flight.get('marketingAirline')
+    if aerolinea is not None:
+        info['aerolinea'] = aerolinea.get('name', 'N/A')
+        numero = flight.get('flightNumber', '')
+        if not numero and segments is not _FALTA and segments:
+            numero = segments[0].get('flightNumber', '')
+        info['numero_vuelo'] = f"{aerolinea.get('code', '')}{numero}" if numero else "N/A"
+    
+    # Horarios
+    salida = flight.get('departureDateTime', '')
+    if salida and len(salida) > 16:
+        info['hora_salida'] = salida[11:16]
+    llegada = flight.get('arrivalDateTime', '')
+    if llegada and len(llegada) > 16:
+        info['hora_llegada'] = llegada[11:16]
+    
+    # Duración (las funciones _texto_* solo se llaman cuando el valor no está en caché)
+    dur = flight.get('elapsedTime', '')
+    texto = caches['duracion'].get(dur)
+    info['duracion'] = texto if texto is not None else _texto_duracion(dur, caches['duracion'])
+    
+    # Equipaje de bodega (Checked baggage)
+    bag = flight.get('baggage', _FALTA)
+    if bag is not _FALTA:
+        info['equipaje_bodega'] = _texto_equipaje(bag, "{} maleta(s) 23kg", "1 maleta 23kg", caches['bodega'])
+    
+    # Equipaje de mano (Hand baggage / Carry-on). Sin campo handBaggage (ej: Sky Airline): no especificado
+    hand_bag = flight.get('handBaggage', _FALTA)
+    if hand_bag is not _FALTA:
+        info['equipaje_mano'] = _texto_equipaje(hand_bag, "{} pieza(s)", "1 pieza", caches['mano'])
+    
+    # Personal item: REGLA — todas las aerolíneas permiten al menos un bolso/mochila,
+    # incluso en tarifas básicas sin equipaje de mano, así que queda siempre "Incluido"
+    
+    # Clase
+    fare = flight.get('brandedFare')
+    if fare is not None:
+        info['clase'] = fare.get('brandName', 'Economy')
+    
+    # Escalas
+    if segments is not _FALTA:
+        num_escalas = len(segments) - 1
+        if num_escalas > 0:
+            info['escalas'] = num_escalas
+            info['escalas_texto'] = "1 escala" if num_escalas == 1 else f"{num_escalas} escalas"
+
+
+def extraer_info_vuelo(vuelo, origen, destino, fecha_ida, fecha_vuelta, adultos, ninos, infantes, exacto=False):
     """Extrae toda la información del vuelo"""
+    return normalizar_vuelos([vuelo], origen, destino, fecha_ida, fecha_vuelta, adultos, ninos, infantes, exacto)[0]
+
+
+def normalizar_vuelos(vuelos_raw, origen, destino, fecha_ida, fecha_vuelta, adultos, ninos, infantes, exacto=False):
+    """
+    Normaliza todo el array 'data' de la API en una sola pasada.
+    
+    Los campos de la búsqueda se calculan una sola vez y los precios, equipajes
+    y duraciones ya parseados se reutilizan entre vuelos.
     
-    precio, moneda = extraer_precio(vuelo)
+    - exacto: True para precios en Decimal en vez de float
+    """
+    
+    caches = _nuevas_caches()
     
-    info = {
+    # Campos comunes a toda la búsqueda
+    base = {
         'origen': origen,
         'origen_nombre': nombre_aeropuerto(origen),
         'destino': destino,
@@ -194,153 +355,53 @@ def extraer_info_vuelo(vuelo, origen, destino, fecha_ida, fecha_vuelta, adultos,
         'ninos': ninos,
         'infantes': infantes,
         'pasajeros_total': adultos + ninos + infantes,
-        'aerolinea': "N/A",
-        'numero_vuelo': "N/A",
-        'hora_salida': "N/A",
-        'hora_llegada': "N/A",
-        'duracion': "N/A",
-        'escalas': 0,
-        'escalas_texto': "Directo",
-        'equipaje_bodega': "No especificado",
-        'equipaje_mano': "No especificado",
-        'personal_item': "Incluido (bolso/mochila)",
-        'clase': "Economy",
-        'precio': precio,
-        'moneda': moneda,
-        'precio_formato': f"${precio:.2f} {moneda}" if precio > 0 else "Consultar"
+        **_TRAMO_VACIO,
+        'precio': 0.0,
+        'moneda': "USD",
+        'precio_formato': "Consultar"
     }
     
-    # Extraer del itinerario
-    if 'itinerary' in vuelo and len(vuelo['itinerary']) > 0:
-        tramo = vuelo['itinerary'][0]
+    # Tramos pedidos, en el mismo orden que el itinerario de buscar_vuelos_api
+    rutas = [{'origen': origen, 'destino': destino, 'fecha': fecha_ida}]
+    if fecha_vuelta:
+        rutas.append({'origen': destino, 'destino': origen, 'fecha': fecha_vuelta})
+    # Plantilla de cada tramo: ruta + valores por defecto, se copia una vez por tramo
+    plantillas = [{**ruta, **_TRAMO_VACIO} for ruta in rutas]
+    
+    vuelos_info = []
+    for vuelo in vuelos_raw:
+        info = dict(base)
+        
+        precio, moneda = extraer_precio(vuelo, exacto, caches)
+        info['precio'] = precio
+        info['moneda'] = moneda
+        if precio > 0:
+            info['precio_formato'] = f"${precio:.2f} {moneda}"
         
-        if 'flights' in tramo and len(tramo['flights']) > 0:
-            flight = tramo['flights'][0]
-            
-            # Aerolínea
-            if 'marketingAirline' in flight:
-                info['aerolinea'] = flight['marketingAirline'].get('name', 'N/A')
-                codigo_aero = flight['marketingAirline'].get('code', '')
-                numero = flight.get('flightNumber', '')
-                if not numero and 'segments' in flight and len(flight['segments']) > 0:
-                    numero = flight['segments'][0].get('flightNumber', '')
-                info['numero_vuelo'] = f"{codigo_aero}{numero}" if numero else "N/A"
-            
-            # Horarios
-            salida = flight.get('departureDateTime', '')
-            llegada = flight.get('arrivalDateTime', '')
-            if salida and len(salida) > 16:
-                info['hora_salida'] = salida[11:16]
-            if llegada and len(llegada) > 16:
-                info['hora_llegada'] = llegada[11:16]
-            
-            # Duración
-            dur = flight.get('elapsedTime', '')
-            if dur and len(dur) >= 4:
-                try:
-                    horas = int(dur[:2])
-                    mins = int(dur[2:4])
-                    info['duracion'] = f"{horas}h {mins}m"
-                except (ValueError, IndexError):
-                    info['duracion'] = "N/A"
-            
-            # Equipaje de bodega (Checked baggage)
-            if 'baggage' in flight:
-                bag = flight['baggage']
-                piezas = str(bag.get('pieces', '0'))
-                if piezas != '0' and piezas != '':
-                    info['equipaje_bodega'] = f"{piezas} maleta(s) 23kg"
-                else:
-                    desc = bag.get('description', '').upper()
-                    if 'INCLUDED' in desc or 'INCLUIDO' in desc:
-                        info['equipaje_bodega'] = "1 maleta 23kg"
-                    else:
-                        info['equipaje_bodega'] = "No incluido"
-            else:
-                info['equipaje_bodega'] = "No especificado"
-            
-            # Equipaje de mano (Hand baggage / Carry-on)
-            if 'handBaggage' in flight:
-                hand_bag = flight['handBaggage']
-                piezas_mano = str(hand_bag.get('pieces', '0'))
-                if piezas_mano != '0' and piezas_mano != '':
-                    info['equipaje_mano'] = f"{piezas_mano} pieza(s)"
-                else:
-                    desc_mano = hand_bag.get('description', '').upper()
-                    if 'INCLUDED' in desc_mano or 'INCLUIDO' in desc_mano:
-                        info['equipaje_mano'] = "1 pieza"
-                    else:
-                        info['equipaje_mano'] = "No incluido"
-            else:
-                # Si no hay campo handBaggage (ej: Sky Airline), no especificamos
-                info['equipaje_mano'] = "No especificado"
-            
-            # Personal item (bolso/mochila pequeña)
-            # REGLA: Todas las aerolíneas permiten al menos un personal item (bolso/mochila)
-            # incluso en tarifas básicas sin equipaje de mano
-            
-            # Si tiene equipaje de mano incluido, obviamente incluye personal item
-            if info.get('equipaje_mano') and 'pieza' in info['equipaje_mano']:
-                info['personal_item'] = "Incluido (bolso/mochila)"
-            # Si no hay campo handBaggage en el JSON (como Sky Airline)
-            elif 'handBaggage' not in flight:
-                # Asumir que sí incluye personal item, porque todas las aerolíneas lo permiten
-                info['personal_item'] = "Incluido (bolso/mochila)"
-            # Si hay campo handBaggage pero es "0" o "No incluido"
-            elif info.get('equipaje_mano') == "No incluido":
-                # Para tarifas básicas (BASIC, LIGHT), el personal item sigue incluido
-                clase_nombre = info.get('clase', '').upper()
-                if 'BASIC' in clase_nombre or 'LIGHT' in clase_nombre or clase_nombre == '':
-                    info['personal_item'] = "Incluido (bolso/mochila)"
-                else:
-                    info['personal_item'] = "Incluido (bolso/mochila)"
-            else:
-                info['personal_item'] = "Incluido (bolso/mochila)"
-            
-            # Clase
-            if 'brandedFare' in flight:
-                clase = flight['brandedFare'].get('brandName', 'Economy')
-                info['clase'] = clase
-            
-            # Escalas
-            if 'segments' in flight:
-                num_escalas = max(0, len(flight['segments']) - 1)
-                info['escalas'] = num_escalas
-                if num_escalas == 0:
-                    info['escalas_texto'] = "Directo"
-                elif num_escalas == 1:
-                    info['escalas_texto'] = "1 escala"
-                else:
-                    info['escalas_texto'] = f"{num_escalas} escalas"
+        # Extraer cada tramo del itinerario (ida, vuelta...). Solo ida: directo sobre info
+        itinerario = vuelo.get('itinerary') or ()
+        if len(itinerario) == 1:
+            _llenar_tramo(info, itinerario[0], caches)
+        elif itinerario:
+            tramos = []
+            for i, tramo in enumerate(itinerario):
+                info_tramo = plantillas[i].copy() if i < len(plantillas) else dict(_TRAMO_VACIO)
+                _llenar_tramo(info_tramo, tramo, caches)
+                tramos.append(info_tramo)
+            # Los campos de primer nivel siguen describiendo el tramo de ida
+            ida = tramos[0]
+            for campo in _TRAMO_VACIO:
+                info[campo] = ida[campo]
+            # 'tramos' solo en itinerarios de varios tramos: en solo ida repetiría el primer nivel
+            info['tramos'] = tramos
+        
+        vuelos_info.append(info)
     
-    return info
+    return vuelos_info
 
 
-def buscar_vuelos(origen, destino, fecha_ida, fecha_vuelta=None, adultos=1, ninos=0, infantes=0, top=5):
-    """
-    Función principal de búsqueda
-    
-    Parámetros:
-    - origen: código IATA (ej: "LIM")
-    - destino: código IATA (ej: "CUZ")  
-    - fecha_ida: formato YYYYMMDD (ej: "20260201")
-    - fecha_vuelta: formato YYYYMMDD o None para solo ida
-    - adultos, ninos, infantes: cantidad de pasajeros
-    - top: cuántos resultados mostrar (default 5)
-    
-    Retorna: lista de los mejores vuelos
-    """
-    
-    # Calcular pasajeros
-    total_pasajeros = adultos + ninos + infantes
-    texto_pasajeros = []
-    if adultos > 0:
-        texto_pasajeros.append(f"{adultos} adulto{'s' if adultos > 1 else ''}")
-    if ninos > 0:
-        texto_pasajeros.append(f"{ninos} niño{'s' if ninos > 1 else ''}")
-    if infantes > 0:
-        texto_pasajeros.append(f"{infantes} infante{'s' if infantes > 1 else ''}")
-    pasajeros_str = ", ".join(texto_pasajeros)
+def mostrar_busqueda(origen, destino, fecha_ida, fecha_vuelta, pasajeros_str):
+    """Imprime la cabecera de la búsqueda"""
     
     # Header de búsqueda
     print(f"\n{'═'*75}")
@@ -354,30 +415,10 @@ def buscar_vuelos(origen, destino, fecha_ida, fecha_vuelta=None, adultos=1, nino
         print(f"   📅 VUELTA:    Solo ida")
     print(f"   👥 PASAJEROS: {pasajeros_str}")
     print(f"{'═'*75}")
-    
-    # Buscar
-    print(f"\n   ⏳ Buscando vuelos...")
-    vuelos_raw = buscar_vuelos_api(origen, destino, fecha_ida, fecha_vuelta, adultos, ninos, infantes)
-    
-    if not vuelos_raw:
-        print(f"   ❌ No se encontraron vuelos para esta ruta/fecha")
-        return []
-    
-    print(f"   ✅ {len(vuelos_raw)} opciones encontradas")
-    
-    # Extraer info
-    vuelos_info = []
-    for v in vuelos_raw:
-        info = extraer_info_vuelo(v, origen, destino, fecha_ida, fecha_vuelta, adultos, ninos, infantes)
-        vuelos_info.append(info)
-    
-    # Ordenar por precio
-    vuelos_con_precio = [v for v in vuelos_info if v['precio'] > 0]
-    vuelos_sin_precio = [v for v in vuelos_info if v['precio'] == 0]
-    vuelos_ordenados = sorted(vuelos_con_precio, key=lambda x: x['precio']) + vuelos_sin_precio
-    
-    # TOP resultados
-    mejores = vuelos_ordenados[:top]
+
+
+def mostrar_resultados(mejores, pasajeros_str, fecha_vuelta):
+    """Imprime la tabla de mejores ofertas y el detalle de equipaje"""
     
     # Mostrar resultados
     print(f"\n   💰 TOP {len(mejores)} OFERTAS MÁS BARATAS:")
@@ -418,6 +459,64 @@ def buscar_vuelos(origen, destino, fecha_ida, fecha_vuelta=None, adultos=1, nino
         print(f"      🎒 Equipaje de mano:    {v.get('equipaje_mano', 'No especificado')}")
         print(f"      👜 Bolso/mochila:       {v.get('personal_item', 'No especificado')}")
     print(f"   {'─'*71}")
+
+
+def buscar_vuelos(origen, destino, fecha_ida, fecha_vuelta=None, adultos=1, ninos=0, infantes=0, top=5, precios_exactos=False, mostrar=True):
+    """
+    Función principal de búsqueda
+    
+    Parámetros:
+    - origen: código IATA (ej: "LIM")
+    - destino: código IATA (ej: "CUZ")  
+    - fecha_ida: formato YYYYMMDD (ej: "20260201")
+    - fecha_vuelta: formato YYYYMMDD o None para solo ida
+    - adultos, ninos, infantes: cantidad de pasajeros
+    - top: cuántos resultados mostrar (default 5)
+    - precios_exactos: True para precios en Decimal en vez de float
+    - mostrar: False para no imprimir las tablas (uso desde la API)
+    
+    Retorna: lista de los mejores vuelos
+    """
+    
+    # Calcular pasajeros
+    total_pasajeros = adultos + ninos + infantes
+    texto_pasajeros = []
+    if adultos > 0:
+        texto_pasajeros.append(f"{adultos} adulto{'s' if adultos > 1 else ''}")
+    if ninos > 0:
+        texto_pasajeros.append(f"{ninos} niño{'s' if ninos > 1 else ''}")
+    if infantes > 0:
+        texto_pasajeros.append(f"{infantes} infante{'s' if infantes > 1 else ''}")
+    pasajeros_str = ", ".join(texto_pasajeros)
+    
+    # Buscar
+    if mostrar:
+        mostrar_busqueda(origen, destino, fecha_ida, fecha_vuelta, pasajeros_str)
+        print(f"\n   ⏳ Buscando vuelos...")
+    vuelos_raw = buscar_vuelos_api(origen, destino, fecha_ida, fecha_vuelta, adultos, ninos, infantes)
+    
+    if not vuelos_raw:
+        if mostrar:
+            print(f"   ❌ No se encontraron vuelos para esta ruta/fecha")
+        return []
+    
+    if mostrar:
+        print(f"   ✅ {len(vuelos_raw)} opciones encontradas")
+    
+    # Extraer info
+    vuelos_info = normalizar_vuelos(vuelos_raw, origen, destino, fecha_ida, fecha_vuelta, adultos, ninos, infantes,
+                                    exacto=precios_exactos)
+    
+    # Ordenar por precio
+    vuelos_con_precio = [v for v in vuelos_info if v['precio'] > 0]
+    vuelos_sin_precio = [v for v in vuelos_info if v['precio'] == 0]
+    vuelos_ordenados = sorted(vuelos_con_precio, key=lambda x: x['precio']) + vuelos_sin_precio
+    
+    # TOP resultados
+    mejores = vuelos_ordenados[:top]
+    
+    if mostrar:
+        mostrar_resultados(mejores, pasajeros_str, fecha_vuelta)
     
     return mejores
 
@@ -0,0 +1,47 @@
+import json
+import os
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import api_costamar
+import costamar_v4_2_FINAL_VERIFICADO as scraper
+
+FIXTURE = os.path.join(RAIZ, 'tests', 'fixtures', 'vuelos_golden.json')
+
+
+def cargar_casos():
+    """Casos golden: [0] solo ida LIM→CUZ, [1] ida y vuelta LIM→MIA"""
+    with open(FIXTURE, encoding='utf-8') as f:
+        return json.load(f)['casos']
+
+
+@pytest.fixture(autouse=True)
+def cache_vacia():
+    api_costamar._cache.clear()
+    api_costamar._volatilidad.clear()
+    yield
+    api_costamar._cache.clear()
+    api_costamar._volatilidad.clear()
+
+
+@pytest.fixture
+def cliente():
+    return api_costamar.app.test_client()
+
+
+@pytest.fixture
+def api_falsa(monkeypatch):
+    """Reemplaza la llamada HTTP a Costamar por los vuelos golden y registra cada búsqueda"""
+    casos = cargar_casos()
+    llamadas = []
+
+    def buscar_vuelos_api(origen, destino, fecha_ida, fecha_vuelta=None, adultos=1, ninos=0, infantes=0):
+        llamadas.append((origen, destino, fecha_ida, fecha_vuelta))
+        return casos[1 if fecha_vuelta else 0]['data']
+
+    monkeypatch.setattr(scraper, 'buscar_vuelos_api', buscar_vuelos_api)
+    return llamadas
@@ -0,0 +1,193 @@
+"""
+TTL adaptativo de la caché por (ruta, días hasta la salida).
+
+    python -m pytest tests/test_cache_ttl.py
+"""
+import copy
+import os
+import subprocess
+import sys
+import types
+from datetime import date, timedelta
+
+import pytest
+
+import api_costamar
+import costamar_v4_2_FINAL_VERIFICADO as scraper
+from api_costamar import (grupo_volatilidad, firma_resultado, registrar_refresco, cache_ttl,
+                          CACHE_TTL_INICIAL, CACHE_TTL_MIN, CACHE_TTL_MAX)
+from conftest import RAIZ
+
+
+def en_dias(dias):
+    return (date.today() + timedelta(days=dias)).strftime('%Y%m%d')
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    """Reemplaza _time.time de la API por un reloj que avanza a mano"""
+    ahora = types.SimpleNamespace(t=1_000_000.0)
+    monkeypatch.setattr(api_costamar, '_time', types.SimpleNamespace(time=lambda: ahora.t))
+    return ahora
+
+
+@pytest.fixture
+def api_variable(monkeypatch):
+    """API falsa cuyo precio se cambia a mano entre búsquedas"""
+    estado = {'precio': 100.0, 'llamadas': 0}
+
+    def buscar_vuelos_api(*args):
+        estado['llamadas'] += 1
+        return [{'pricing': {'totalAmount': estado['precio']}}]
+
+    monkeypatch.setattr(scraper, 'buscar_vuelos_api', buscar_vuelos_api)
+    return estado
+
+
+def pedido(dias=90):
+    return {'origen': 'Lima', 'destino': 'Cusco', 'fechaIda': en_dias(dias)}
+
+
+# ==========================================
+# 📅 GRUPOS
+# ==========================================
+
+@pytest.mark.parametrize('dias, rango', [
+    (-5, '0-3'), (0, '0-3'), (3, '0-3'), (4, '4-7'), (7, '4-7'), (8, '8-14'),
+    (15, '15-30'), (30, '15-30'), (60, '31-60'), (61, '61+'), (300, '61+'),
+])
+def test_rango_de_dias(dias, rango):
+    assert grupo_volatilidad('LIM-CUZ', en_dias(dias)) == ('LIM-CUZ', rango)
+
+@pytest.mark.parametrize('fecha', ['', 'mañana', '2026-02-20', None])
+def test_fecha_invalida_va_a_grupo_na(fecha):
+    assert grupo_volatilidad('LIM-CUZ', fecha) == ('LIM-CUZ', 'N/A')
+
+
+# ==========================================
+# 🔁 AJUSTE DEL TTL
+# ==========================================
+
+def resultado(precio, **vuelo):
+    return {'vuelos': [{'precio': precio, 'numero_vuelo': 'LA2010', 'hora_salida': '08:00', **vuelo}]}
+
+def test_ttl_sube_sin_cambios_y_baja_con_cambios():
+    grupo = ('LIM-CUZ', '61+')
+    registrar_refresco(grupo, resultado(100.0), resultado(100.0))
+    assert cache_ttl(grupo) == 450
+    registrar_refresco(grupo, resultado(100.0), resultado(90.0))
+    assert cache_ttl(grupo) == 225
+    estado = api_costamar._volatilidad[grupo]
+    assert (estado['refrescos'], estado['cambios']) == (2, 1)
+
+def test_ttl_respeta_los_limites():
+    grupo = ('LIM-CUZ', '0-3')
+    for _ in range(20):
+        registrar_refresco(grupo, resultado(100.0), resultado(50.0))
+    assert cache_ttl(grupo) == CACHE_TTL_MIN
+    for _ in range(30):
+        registrar_refresco(grupo, resultado(100.0), resultado(100.0))
+    assert cache_ttl(grupo) == CACHE_TTL_MAX
+
+@pytest.mark.parametrize('ttl, siguiente', [(1, 2), (2, 3), (3, 5), (10, 15)])
+def test_ttl_chico_siempre_sube(ttl, siguiente):
+    grupo = ('LIM-CUZ', '8-14')
+    api_costamar._volatilidad[grupo] = {'ttl': ttl, 'refrescos': 0, 'cambios': 0}
+    registrar_refresco(grupo, resultado(100.0), resultado(100.0))
+    assert cache_ttl(grupo) == siguiente
+
+def test_grupo_nuevo_usa_ttl_inicial():
+    assert cache_ttl(('AQP-LIM', '4-7')) == CACHE_TTL_INICIAL
+    assert cache_ttl(None) == api_costamar.CACHE_TTL
+
+def test_firma_incluye_tramos_de_vuelta():
+    ida = {'numero_vuelo': 'LA2010', 'hora_salida': '08:00'}
+    antes = resultado(100.0, tramos=[ida, {'numero_vuelo': 'LA2011', 'hora_salida': '18:00'}])
+    despues = copy.deepcopy(antes)
+    despues['vuelos'][0]['tramos'][1]['hora_salida'] = '21:00'
+    assert firma_resultado(antes) != firma_resultado(despues)
+    assert firma_resultado(antes) == firma_resultado(copy.deepcopy(antes))
+
+
+# ==========================================
+# ⏱️ CACHÉ DE /api/cotizar
+# ==========================================
+
+def test_cache_vence_segun_ttl_del_grupo(cliente, reloj, api_variable):
+    cliente.post('/api/cotizar', json=pedido())
+    reloj.t += CACHE_TTL_INICIAL - 1
+    cliente.post('/api/cotizar', json=pedido())
+    assert api_variable['llamadas'] == 1
+    reloj.t += 2
+    cliente.post('/api/cotizar', json=pedido())
+    assert api_variable['llamadas'] == 2
+
+def test_refresco_reciente_ajusta_el_ttl(cliente, reloj, api_variable):
+    grupo = ('LIM-CUZ', '61+')
+    cliente.post('/api/cotizar', json=pedido())
+    reloj.t += CACHE_TTL_INICIAL + 1
+    cliente.post('/api/cotizar', json=pedido())
+    assert api_costamar._volatilidad[grupo] == {'ttl': 450, 'refrescos': 1, 'cambios': 0}
+
+    api_variable['precio'] = 80.0
+    reloj.t += 451
+    cliente.post('/api/cotizar', json=pedido())
+    assert api_costamar._volatilidad[grupo] == {'ttl': 225, 'refrescos': 2, 'cambios': 1}
+
+def test_refresco_de_entrada_vieja_no_cuenta(cliente, reloj, api_variable):
+    cliente.post('/api/cotizar', json=pedido())
+    # Un día después el precio cambió, pero eso no dice nada de un TTL de 5 minutos
+    api_variable['precio'] = 80.0
+    reloj.t += 24 * 3600
+    cliente.post('/api/cotizar', json=pedido())
+    assert api_variable['llamadas'] == 2
+    assert api_costamar._volatilidad == {}
+
+def test_ventana_es_multiplo_del_ttl(cliente, reloj, api_variable):
+    cliente.post('/api/cotizar', json=pedido())
+    reloj.t += api_costamar.CACHE_TTL_VENTANA * CACHE_TTL_INICIAL
+    cliente.post('/api/cotizar', json=pedido())
+    assert api_costamar._volatilidad[('LIM-CUZ', '61+')]['refrescos'] == 1
+
+def test_ida_y_vuelta_tiene_su_propio_grupo(cliente, reloj, api_variable):
+    cliente.post('/api/cotizar', json={**pedido(2), 'fechaVuelta': en_dias(9)})
+    reloj.t += CACHE_TTL_INICIAL + 1
+    cliente.post('/api/cotizar', json={**pedido(2), 'fechaVuelta': en_dias(9)})
+    assert list(api_costamar._volatilidad) == [('LIM-CUZ-RT', '0-3')]
+
+def test_endpoint_cache_ttl(cliente, reloj, api_variable):
+    for dias in (2, 90):
+        cliente.post('/api/cotizar', json=pedido(dias))
+    reloj.t += CACHE_TTL_INICIAL + 1
+    api_variable['precio'] = 80.0
+    for dias in (2, 90):
+        cliente.post('/api/cotizar', json=pedido(dias))
+
+    respuesta = cliente.get('/api/cache/ttl').get_json()
+    assert (respuesta['ttl_inicial'], respuesta['ttl_min'], respuesta['ttl_max']) == (CACHE_TTL_INICIAL, CACHE_TTL_MIN, CACHE_TTL_MAX)
+    assert respuesta['grupos'] == [
+        {'ruta': 'LIM-CUZ', 'dias': '0-3', 'ttl': 150, 'refrescos': 1, 'cambios': 1, 'tasa_cambio': 1.0},
+        {'ruta': 'LIM-CUZ', 'dias': '61+', 'ttl': 150, 'refrescos': 1, 'cambios': 1, 'tasa_cambio': 1.0},
+    ]
+
+
+# ==========================================
+# ⚙️ CONFIGURACIÓN
+# ==========================================
+
+def importar_api(**env):
+    return subprocess.run(
+        [sys.executable, '-c', 'import api_costamar as a; print(a.CACHE_TTL_INICIAL)'],
+        cwd=RAIZ, env={**os.environ, **env}, capture_output=True, text=True)
+
+def test_ttl_inicial_se_ajusta_al_maximo():
+    assert importar_api(CACHE_TTL_MAX='120').stdout.strip() == '120'
+
+@pytest.mark.parametrize('env', [
+    {'CACHE_TTL_MIN': '0'},
+    {'CACHE_TTL_MIN': '500', 'CACHE_TTL_MAX': '100'},
+])
+def test_configuracion_invalida_no_arranca(env):
+    proceso = importar_api(**env)
+    assert proceso.returncode != 0
+    assert 'ValueError' in proceso.stderr
@@ -0,0 +1,124 @@
+"""
+Formato compacto (format=compact) y proyección de campos (fields=).
+
+    python -m pytest tests/test_formato_compacto.py
+    python tests/test_formato_compacto.py              # tamaño y tiempo de serialización
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from conftest import cargar_casos
+from api_costamar import app, compactar_vuelos, CAMPOS_DICCIONARIO
+
+PEDIDO = {'origen': 'Lima', 'destino': 'Cusco', 'fechaIda': '20260220'}
+
+
+def descompactar(compacto):
+    """Reconstruye la lista de vuelos a partir del formato compacto"""
+    vuelos = [dict(compacto['busqueda']) for _ in range(compacto['total'])]
+    for campo, columna in compacto['columnas'].items():
+        diccionario = compacto['diccionarios'].get(campo)
+        for vuelo, valor in zip(vuelos, columna):
+            vuelo[campo] = diccionario[valor] if diccionario is not None else valor
+    return vuelos
+
+
+# ==========================================
+# ✅ TESTS
+# ==========================================
+
+def test_cabecera_solo_con_valores_iguales():
+    vuelos = [
+        {'origen': 'LIM', 'adultos': 1, 'precio': 100.0},
+        {'origen': 'LIM', 'adultos': 2, 'precio': 90.0},
+    ]
+    compacto = compactar_vuelos(vuelos)
+    assert compacto['busqueda'] == {'origen': 'LIM'}
+    assert compacto['columnas']['adultos'] == [1, 2]
+    assert compacto['columnas']['precio'] == [100.0, 90.0]
+
+def test_campos_por_vuelo_nunca_van_a_cabecera():
+    # precio no es un campo de búsqueda: aunque se repita, sigue siendo columna
+    compacto = compactar_vuelos([{'precio': 50.0}, {'precio': 50.0}])
+    assert compacto['busqueda'] == {}
+    assert compacto['columnas']['precio'] == [50.0, 50.0]
+
+def test_diccionarios_decodifican_los_strings_originales():
+    vuelos = cargar_casos()[0]['esperado']
+    compacto = compactar_vuelos(vuelos)
+    for campo in CAMPOS_DICCIONARIO:
+        diccionario = compacto['diccionarios'][campo]
+        assert len(diccionario) == len(set(diccionario))
+        assert [diccionario[i] for i in compacto['columnas'][campo]] == [v[campo] for v in vuelos]
+
+def test_compacto_reconstruye_los_vuelos():
+    vuelos = cargar_casos()[0]['esperado']
+    assert descompactar(compactar_vuelos(vuelos)) == vuelos
+
+def test_fields_en_formato_completo(cliente, api_falsa):
+    respuesta = cliente.post('/api/cotizar', json={**PEDIDO, 'fields': 'precio, aerolinea'}).get_json()
+    assert respuesta['success']
+    assert all(set(v) == {'precio', 'aerolinea'} for v in respuesta['vuelos'])
+
+def test_fields_en_formato_compacto(cliente, api_falsa):
+    respuesta = cliente.post('/api/cotizar', json={**PEDIDO, 'format': 'compact', 'fields': ['precio', 'aerolinea']}).get_json()
+    assert respuesta['formato'] == 'compact'
+    assert set(respuesta['columnas']) == {'precio', 'aerolinea'}
+    assert set(respuesta['diccionarios']) == {'aerolinea'}
+    assert respuesta['busqueda'] == {}
+
+def test_format_y_fields_por_query_string(cliente, api_falsa):
+    respuesta = cliente.post('/api/cotizar?format=compact&fields=precio,origen', json=PEDIDO).get_json()
+    assert respuesta['busqueda'] == {'origen': 'LIM'}
+    assert set(respuesta['columnas']) == {'precio'}
+
+def test_compacto_y_completo_desde_cache(cliente, api_falsa):
+    completo = cliente.post('/api/cotizar', json=PEDIDO).get_json()
+    compacto = cliente.post('/api/cotizar', json={**PEDIDO, 'format': 'compact'}).get_json()
+    assert len(api_falsa) == 1
+    assert descompactar(compacto) == completo['vuelos']
+
+def test_formato_no_soportado(cliente, api_falsa):
+    respuesta = cliente.post('/api/cotizar', json={**PEDIDO, 'format': 'xml'})
+    assert respuesta.status_code == 400
+    assert api_falsa == []
+
+
+# ==========================================
+# ⏱️ TAMAÑO Y SERIALIZACIÓN
+# ==========================================
+
+def medir(funcion, repeticiones):
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return resultado, mejor * 1000
+
+def benchmark(num_vuelos, repeticiones):
+    with app.app_context():
+        for caso in cargar_casos():
+            esperado = caso['esperado']
+            vuelos = (esperado * (num_vuelos // len(esperado) + 1))[:num_vuelos]
+            # Misma serialización que jsonify; el compacto incluye el tiempo de compactar
+            completo, t_completo = medir(lambda: app.json.dumps({'success': True, 'vuelos': vuelos}), repeticiones)
+            compacto, t_compacto = medir(lambda: app.json.dumps(compactar_vuelos(vuelos)), repeticiones)
+
+            tipo = "ida y vuelta" if caso['busqueda']['fecha_vuelta'] else "solo ida"
+            print(f"\n   {num_vuelos} vuelos, {tipo}")
+            print(f"   {'full':<10} {len(completo) / 1024:8.1f} KB {t_completo:8.1f} ms")
+            print(f"   {'compact':<10} {len(compacto) / 1024:8.1f} KB {t_compacto:8.1f} ms"
+                  f"   x{len(completo) / len(compacto):.1f} menos bytes, x{t_completo / t_compacto:.1f} más rápido")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tamaño y tiempo de serialización de format=compact")
+    parser.add_argument('--vuelos', type=int, default=500)
+    parser.add_argument('--repeticiones', type=int, default=15)
+    opciones = parser.parse_args()
+    benchmark(opciones.vuelos, opciones.repeticiones)
@@ -0,0 +1,152 @@
+"""
+Ida y vuelta (fechaVuelta) y multidestino (tramos) en /api/cotizar.
+
+    python -m pytest tests/test_multidestino.py
+"""
+import pytest
+
+import api_costamar
+import costamar_v4_2_FINAL_VERIFICADO as scraper
+from api_costamar import compactar_vuelos, MAX_TRAMOS, MAX_BUSQUEDAS_PARALELAS
+
+IDA_Y_VUELTA = {'origen': 'Lima', 'destino': 'Miami', 'fechaIda': '20260310', 'fechaVuelta': '20260320'}
+MULTIDESTINO = {'tramos': [
+    {'origen': 'Lima', 'destino': 'Cusco', 'fechaIda': '20260220'},
+    {'origen': 'Cusco', 'destino': 'Arequipa', 'fechaIda': '20260223'},
+    {'origen': 'Arequipa', 'destino': 'Lima', 'fechaIda': '20260226'},
+]}
+
+
+# ==========================================
+# ✈️ IDA Y VUELTA
+# ==========================================
+
+def test_tramos_solo_en_vuelos_de_varios_tramos(cliente, api_falsa):
+    vuelos = cliente.post('/api/cotizar', json=IDA_Y_VUELTA).get_json()['vuelos']
+    assert api_falsa == [('LIM', 'MIA', '20260310', '20260320')]
+    con_tramos = [v for v in vuelos if 'tramos' in v]
+    assert con_tramos
+    for v in con_tramos:
+        ida, vuelta = v['tramos']
+        assert (ida['origen'], ida['destino'], ida['fecha']) == ('LIM', 'MIA', '20260310')
+        assert (vuelta['origen'], vuelta['destino'], vuelta['fecha']) == ('MIA', 'LIM', '20260320')
+        # El primer nivel sigue describiendo la ida
+        assert v['hora_salida'] == ida['hora_salida']
+
+    solo_ida = cliente.post('/api/cotizar', json={'origen': 'Lima', 'destino': 'Cusco', 'fechaIda': '20260220'}).get_json()
+    assert not any('tramos' in v for v in solo_ida['vuelos'])
+
+def test_fields_se_aplica_a_los_tramos(cliente, api_falsa):
+    pedido = {**IDA_Y_VUELTA, 'fields': 'precio,hora_salida,tramos'}
+    vuelos = cliente.post('/api/cotizar', json=pedido).get_json()['vuelos']
+    assert all(set(v) <= {'precio', 'hora_salida', 'tramos'} for v in vuelos)
+    assert all(set(t) == {'hora_salida'} for v in vuelos for t in v.get('tramos', ()))
+
+    compacto = cliente.post('/api/cotizar', json={**pedido, 'format': 'compact'}).get_json()
+    assert set(compacto['columnas']) == {'precio', 'hora_salida'}
+    assert all(set(t['columnas']) == {'hora_salida'} for t in compacto['tramos'])
+
+def test_compacto_tramos_con_cabecera_e_indices(cliente, api_falsa):
+    esperado = cliente.post('/api/cotizar', json=IDA_Y_VUELTA).get_json()['vuelos']
+    compacto = cliente.post('/api/cotizar', json={**IDA_Y_VUELTA, 'format': 'compact'}).get_json()
+    con_tramos = [i for i, v in enumerate(esperado) if 'tramos' in v]
+
+    ida, vuelta = compacto['tramos']
+    assert ida['busqueda'] == {'origen': 'LIM', 'destino': 'MIA', 'fecha': '20260310'}
+    assert vuelta['busqueda'] == {'origen': 'MIA', 'destino': 'LIM', 'fecha': '20260320'}
+    # Los vuelos sin tramos no rellenan columnas: 'indices' dice a qué vuelo va cada fila
+    assert vuelta['indices'] == con_tramos
+    aerolineas = [vuelta['diccionarios']['aerolinea'][i] for i in vuelta['columnas']['aerolinea']]
+    assert aerolineas == [esperado[i]['tramos'][1]['aerolinea'] for i in con_tramos]
+
+def test_compacto_con_tramos_aunque_el_primer_vuelo_no_los_tenga():
+    tramo = {'origen': 'LIM', 'destino': 'MIA', 'aerolinea': 'LATAM'}
+    compacto = compactar_vuelos([{'precio': 1.0}, {'precio': 2.0, 'tramos': [tramo, tramo]}])
+    assert len(compacto['tramos']) == 2
+    assert compacto['tramos'][0]['indices'] == [1]
+    assert compacto['tramos'][0]['busqueda'] == {'origen': 'LIM', 'destino': 'MIA'}
+
+
+# ==========================================
+# 🗺️ MULTIDESTINO
+# ==========================================
+
+def test_multidestino_un_resultado_por_tramo(cliente, api_falsa):
+    respuesta = cliente.post('/api/cotizar', json=MULTIDESTINO).get_json()
+    assert respuesta['success'] and respuesta['tipo'] == 'multidestino'
+    assert [(t['origen'], t['destino']) for t in respuesta['tramos']] == [('LIM', 'CUZ'), ('CUZ', 'AQP'), ('AQP', 'LIM')]
+    minimos = [t['precio_minimo'] for t in respuesta['tramos']]
+    assert respuesta['precio_minimo_total'] == round(sum(minimos), 2)
+
+def test_multidestino_busca_una_vez_los_tramos_repetidos(cliente, api_falsa):
+    tramo = {'origen': 'Lima', 'destino': 'Cusco', 'fechaIda': '20260220'}
+    vuelta = {'origen': 'Cusco', 'destino': 'Lima', 'fechaIda': '20260225'}
+    respuesta = cliente.post('/api/cotizar', json={'tramos': [tramo, vuelta, tramo]}).get_json()
+    assert len(respuesta['tramos']) == 3
+    assert sorted(api_falsa) == [('CUZ', 'LIM', '20260225', None), ('LIM', 'CUZ', '20260220', None)]
+
+def test_multidestino_reutiliza_la_cache_de_cada_tramo(cliente, api_falsa):
+    # Un solo ida previo deja en caché el primer tramo
+    cliente.post('/api/cotizar', json={'origen': 'Lima', 'destino': 'Cusco', 'fechaIda': '20260220'})
+    cliente.post('/api/cotizar', json=MULTIDESTINO)
+    assert len(api_falsa) == 3
+
+    # Otro itinerario que comparte un tramo solo busca el nuevo
+    otro = {'tramos': [MULTIDESTINO['tramos'][1], {'origen': 'Arequipa', 'destino': 'Cusco', 'fechaIda': '20260228'}]}
+    cliente.post('/api/cotizar', json=otro)
+    assert api_falsa[3:] == [('AQP', 'CUZ', '20260228', None)]
+
+def test_multidestino_maximo_de_tramos(cliente, api_falsa):
+    tramos = [{'origen': 'Lima', 'destino': 'Cusco', 'fechaIda': f'202602{d:02d}'} for d in range(1, MAX_TRAMOS + 2)]
+    respuesta = cliente.post('/api/cotizar', json={'tramos': tramos})
+    assert respuesta.status_code == 400
+    assert api_falsa == []
+
+def test_multidestino_total_none_si_un_tramo_no_tiene_precio(cliente, monkeypatch):
+    sin_precio = {'itinerary': [{'flights': [{'marketingAirline': {'name': 'LATAM', 'code': 'LA'}}]}]}
+    con_precio = dict(sin_precio, pricing={'totalAmount': 150.0})
+    monkeypatch.setattr(scraper, 'buscar_vuelos_api',
+                        lambda origen, destino, *args: [sin_precio] if destino == 'AQP' else [con_precio])
+    respuesta = cliente.post('/api/cotizar', json=MULTIDESTINO).get_json()
+    assert [t['precio_minimo'] for t in respuesta['tramos']] == [150.0, None, 150.0]
+    assert respuesta['precio_minimo_total'] is None
+
+def test_multidestino_reutiliza_hilos_y_sesiones(cliente, monkeypatch):
+    sesiones = set()
+
+    def buscar_vuelos_api(*args):
+        sesiones.add(id(scraper.obtener_sesion()))
+        return [{'pricing': {'totalAmount': 100.0}}]
+
+    monkeypatch.setattr(scraper, 'buscar_vuelos_api', buscar_vuelos_api)
+    for _ in range(4):
+        api_costamar._cache.clear()
+        assert cliente.post('/api/cotizar', json=MULTIDESTINO).get_json()['success']
+    # 12 búsquedas, pero nunca más sesiones que hilos del pool compartido
+    assert len(sesiones) <= MAX_BUSQUEDAS_PARALELAS
+
+
+# ==========================================
+# 🚫 PEDIDOS INVÁLIDOS
+# ==========================================
+
+@pytest.mark.parametrize('pedido', [
+    {'tramos': 'Lima-Cusco'},
+    {'tramos': ['Lima', 'Cusco']},
+    {'tramos': [{'origen': 1, 'destino': 'Cusco'}]},
+    {'origen': 'Lima', 'destino': 'Cusco', 'fields': 5},
+    {'origen': 'Lima', 'destino': 'Cusco', 'fields': ['precio', 3]},
+    {'origen': 'Lima', 'destino': 'Cusco', 'adultos': 'dos'},
+    {'origen': 'Lima', 'destino': 'Cusco', 'adultos': 0},
+    {'origen': ['Lima'], 'destino': 'Cusco'},
+    ['Lima', 'Cusco'],
+])
+def test_pedido_invalido_es_400(cliente, api_falsa, pedido):
+    respuesta = cliente.post('/api/cotizar', json=pedido)
+    assert respuesta.status_code == 400
+    assert "object has no attribute" not in respuesta.get_json()['error']
+    assert api_falsa == []
+
+def test_body_que_no_es_json_es_400(cliente, api_falsa):
+    respuesta = cliente.post('/api/cotizar', data='origen=Lima', content_type='text/plain')
+    assert respuesta.status_code == 400
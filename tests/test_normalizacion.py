@@ -0,0 +1,119 @@
+"""
+Validación de normalizar_vuelos contra salidas golden, y benchmark.
+
+Las salidas de tests/fixtures/vuelos_golden.json se registraron con la
+implementación vuelo por vuelo de extraer_info_vuelo, antes de normalizar_vuelos.
+
+    python -m pytest tests/                                   # comparación golden
+    python tests/test_normalizacion.py                        # benchmark
+    python tests/test_normalizacion.py --referencia 191b8e0   # benchmark contra otra versión (git)
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import types
+from decimal import Decimal
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from costamar_v4_2_FINAL_VERIFICADO import extraer_info_vuelo, normalizar_vuelos
+
+FIXTURE = os.path.join(RAIZ, 'tests', 'fixtures', 'vuelos_golden.json')
+MODULO = 'costamar_v4_2_FINAL_VERIFICADO.py'
+
+
+def cargar_casos():
+    with open(FIXTURE, encoding='utf-8') as f:
+        return json.load(f)['casos']
+
+def argumentos(busqueda):
+    return tuple(busqueda[k] for k in ('origen', 'destino', 'fecha_ida', 'fecha_vuelta', 'adultos', 'ninos', 'infantes'))
+
+
+# ==========================================
+# ✅ COMPARACIÓN GOLDEN
+# ==========================================
+
+def test_normalizar_vuelos_golden():
+    for caso in cargar_casos():
+        obtenido = normalizar_vuelos(caso['data'], *argumentos(caso['busqueda']))
+        assert obtenido == caso['esperado']
+        # El orden de los campos también importa (CSV, formato compacto)
+        assert [list(v) for v in obtenido] == [list(v) for v in caso['esperado']]
+
+def test_extraer_info_vuelo_golden():
+    for caso in cargar_casos():
+        args = argumentos(caso['busqueda'])
+        for vuelo, esperado in zip(caso['data'], caso['esperado']):
+            assert extraer_info_vuelo(vuelo, *args) == esperado
+
+def test_precios_exactos():
+    for caso in cargar_casos():
+        exactos = normalizar_vuelos(caso['data'], *argumentos(caso['busqueda']), exacto=True)
+        for info, esperado in zip(exactos, caso['esperado']):
+            assert isinstance(info['precio'], Decimal)
+            assert abs(float(info['precio']) - esperado['precio']) < 1e-9
+            assert info['precio_formato'] == esperado['precio_formato']
+
+def test_precios_exactos_no_finitos():
+    for valor in (float('nan'), float('inf'), 'nan', '$inf'):
+        vuelo = {'pricing': {'totalAmount': valor}}
+        info = extraer_info_vuelo(vuelo, 'LIM', 'CUZ', '20260220', None, 1, 0, 0, exacto=True)
+        assert info['precio'] == 0
+        assert info['precio_formato'] == "Consultar"
+
+
+# ==========================================
+# ⏱️ BENCHMARK
+# ==========================================
+
+def cargar_referencia(revision):
+    """Carga el módulo del scraper tal como estaba en una revisión de git"""
+    fuente = subprocess.run(['git', 'show', f'{revision}:{MODULO}'], cwd=RAIZ,
+                            capture_output=True, text=True, check=True).stdout
+    modulo = types.ModuleType(f'referencia_{revision}')
+    exec(compile(fuente, f'{revision}:{MODULO}', 'exec'), modulo.__dict__)
+    return modulo
+
+def medir(funcion, repeticiones):
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor * 1000
+
+def benchmark(num_vuelos, repeticiones, revision):
+    referencia = cargar_referencia(revision) if revision else None
+    nombre_ref = f"{revision} vuelo por vuelo" if revision else "extraer_info_vuelo vuelo por vuelo"
+    extraer_ref = referencia.extraer_info_vuelo if referencia else extraer_info_vuelo
+    r = random.Random(0)
+
+    for caso in cargar_casos():
+        args = argumentos(caso['busqueda'])
+        # Objetos distintos (como los de response.json()) pero con valores repetidos
+        data = json.loads(json.dumps([r.choice(caso['data']) for _ in range(num_vuelos)]))
+
+        t_ref = medir(lambda: [extraer_ref(v, *args) for v in data], repeticiones)
+        t_lote = medir(lambda: normalizar_vuelos(data, *args), repeticiones)
+        t_exacto = medir(lambda: normalizar_vuelos(data, *args, exacto=True), repeticiones)
+
+        tipo = "ida y vuelta" if caso['busqueda']['fecha_vuelta'] else "solo ida"
+        print(f"\n   {num_vuelos} vuelos, {tipo}")
+        print(f"   {nombre_ref:<40} {t_ref:8.1f} ms")
+        print(f"   {'normalizar_vuelos':<40} {t_lote:8.1f} ms   x{t_ref / t_lote:.2f}")
+        print(f"   {'normalizar_vuelos (exacto)':<40} {t_exacto:8.1f} ms   x{t_ref / t_exacto:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de normalizar_vuelos")
+    parser.add_argument('--vuelos', type=int, default=5000)
+    parser.add_argument('--repeticiones', type=int, default=7)
+    parser.add_argument('--referencia', help="revisión de git a comparar (ej: 191b8e0)")
+    opciones = parser.parse_args()
+    benchmark(opciones.vuelos, opciones.repeticiones, opciones.referencia)